@@ -0,0 +1,252 @@
+# Resilient PDGA page fetching: retries, backoff, circuit breaker and checkpoints
+import json
+import os
+import random
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from requests.exceptions import HTTPError, RequestException
+from requests_html import HTMLSession
+
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+
+class CircuitOpenError(Exception):
+    """Raised when PDGA has failed too often and requests are paused"""
+
+
+class CircuitBreaker:
+    """Stop hitting PDGA after repeated failures
+
+    Opens after failure_threshold consecutive failures, then lets a single
+    trial request through once reset_timeout seconds have passed.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 60) -> None:
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+
+    @property
+    def is_open(self) -> bool:
+        if self.opened_at is None:
+            return False
+        return time.monotonic() - self.opened_at < self.reset_timeout
+
+    def check(self):
+        if self.is_open:
+            raise CircuitOpenError(
+                f"PDGA circuit open after {self.failures} failures, retry later"
+            )
+
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+
+    def record_failure(self):
+        self.failures += 1
+        if self.failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+
+
+PDGA_BREAKER = CircuitBreaker()
+
+
+class RequestCounter:
+    """Number of requests actually sent, retries included"""
+
+    def __init__(self) -> None:
+        self.sent = 0
+
+
+def backoff_delay(attempt: int, base: float = 0.5, cap: float = 30) -> float:
+    """Exponential backoff with full jitter
+
+    Args:
+        attempt (int): Retry number starting at 0
+        base (float, optional): First delay ceiling in seconds. Defaults to 0.5.
+        cap (float, optional): Max delay in seconds. Defaults to 30.
+
+    Returns:
+        float: Seconds to sleep
+    """
+    return random.uniform(0, min(cap, base * 2**attempt))
+
+
+def is_transient(error: Exception) -> bool:
+    """Whether a fetch error is worth retrying later
+
+    Circuit open, timeouts, connection errors and 429/5xx responses are
+    transient. 4xx responses and parse errors won't fix themselves.
+    """
+    if isinstance(error, CircuitOpenError):
+        return True
+    if isinstance(error, HTTPError):
+        return error.response is None or error.response.status_code in RETRY_STATUS
+    return isinstance(error, RequestException)
+
+
+def retry_after(response) -> Optional[float]:
+    """Seconds to wait from a Retry-After header, seconds or HTTP date
+
+    Args:
+        response (response): requests response
+
+    Returns:
+        float: Seconds to sleep, None if header missing or invalid
+    """
+    value = response.headers.get("Retry-After")
+    if value is None:
+        return None
+    try:
+        return max(float(value), 0)
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max((retry_at - datetime.now(timezone.utc)).total_seconds(), 0)
+
+
+def fetch_with_retry(
+    url: str,
+    session: Optional[HTMLSession] = None,
+    retries: int = 3,
+    timeout: float = 30,
+    breaker: CircuitBreaker = PDGA_BREAKER,
+    counter: Optional[RequestCounter] = None,
+    max_delay: float = 30,
+):
+    """GET a PDGA page, retrying timeouts, connection errors and 429/5xx responses
+
+    Waits for the Retry-After header when PDGA sends one, otherwise
+    backs off exponentially with jitter. A Retry-After longer than
+    max_delay is not waited for, the error is raised instead.
+
+    Args:
+        url (str): Page url
+        session (HTMLSession, optional): Session to reuse. Defaults to a new session.
+        retries (int, optional): Retries after the first attempt. Defaults to 3.
+        timeout (float, optional): Request timeout in seconds. Defaults to 30.
+        breaker (CircuitBreaker, optional): Defaults to PDGA_BREAKER.
+        counter (RequestCounter, optional): Counts every request sent.
+        max_delay (float, optional): Longest wait between retries in seconds. Defaults to 30.
+
+    Raises:
+        CircuitOpenError: PDGA has been failing, request not sent
+        RequestException: Last error once retries are used up, or PDGA asked to wait
+            longer than max_delay
+
+    Returns:
+        response: requests response
+    """
+    session = session or HTMLSession()
+    for attempt in range(retries + 1):
+        breaker.check()
+        delay = None
+        try:
+            if counter is not None:
+                counter.sent += 1
+            r = session.get(url, timeout=timeout)
+            if r.status_code in RETRY_STATUS:
+                raise HTTPError(f"{r.status_code} error for {url}", response=r)
+            r.raise_for_status()
+        except HTTPError as e:
+            if e.response is None or e.response.status_code not in RETRY_STATUS:
+                raise
+            breaker.record_failure()
+            if attempt == retries:
+                raise
+            delay = retry_after(e.response)
+            if delay is not None and delay > max_delay:
+                raise
+        except RequestException:
+            breaker.record_failure()
+            if attempt == retries:
+                raise
+        else:
+            breaker.record_success()
+            return r
+        if delay is None:
+            delay = backoff_delay(attempt, cap=max_delay)
+        time.sleep(delay)
+
+
+class Checkpoint:
+    """Completed tournament ratings by player, optionally saved to a JSON file
+
+    Lets a large batch pick up where it left off without re-fetching pages.
+    Pages that failed for good (see is_transient()) are kept in errors so
+    they aren't fetched again either. Callers can keep their own progress in state, e.g. requests spent.
+    The file is written every flush_every saves and on flush().
+    """
+
+    def __init__(self, path: Optional[Path] = None, flush_every: int = 50) -> None:
+        self.path = Path(path) if path else None
+        self.flush_every = flush_every
+        self.unsaved = 0
+        self.pages: Dict[str, List[int]] = {}
+        self.errors: Dict[str, str] = {}
+        self.state: Dict[str, Any] = {}
+        if self.path and self.path.exists():
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            self.pages = data.get("pages", {})
+            self.errors = data.get("errors", {})
+            self.state = data.get("state", {})
+
+    @staticmethod
+    def key(pdga_num: int, url: str) -> str:
+        return f"{pdga_num}:{url}"
+
+    def get(self, pdga_num: int, url: str) -> Optional[List[int]]:
+        return self.pages.get(self.key(pdga_num, url))
+
+    def save(self, pdga_num: int, url: str, ratings: List[int]):
+        self.pages[self.key(pdga_num, url)] = ratings
+        self.unsaved += 1
+        if self.unsaved >= self.flush_every:
+            self.flush()
+
+    def save_error(self, pdga_num: int, url: str, error: str):
+        self.errors[self.key(pdga_num, url)] = error
+        self.unsaved += 1
+        if self.unsaved >= self.flush_every:
+            self.flush()
+
+    def get_error(self, pdga_num: int, url: str) -> Optional[str]:
+        return self.errors.get(self.key(pdga_num, url))
+
+    def done(self, pdga_num: int, url: str) -> bool:
+        """Page has been fetched or failed for good"""
+        key = self.key(pdga_num, url)
+        return key in self.pages or key in self.errors
+
+    def update_state(self, **values):
+        """Set state values, written on the next flush()"""
+        self.state.update(values)
+        self.unsaved += 1
+
+    def flush(self):
+        """Write pages, errors and state to the JSON file"""
+        if self.path and self.unsaved:
+            tmp = self.path.with_suffix(self.path.suffix + ".tmp")
+            with open(tmp, "w", encoding="utf-8") as f:
+                data = {"pages": self.pages, "errors": self.errors, "state": self.state}
+                json.dump(data, f)
+            os.replace(tmp, self.path)
+        self.unsaved = 0
+
+    def clear(self):
+        """Forget all pages and errors, e.g. when a new publication cycle starts. State is kept."""
+        self.pages = {}
+        self.errors = {}
+        self.unsaved = 1
+        self.flush()
@@ -2,26 +2,31 @@
 from requests_html import HTMLSession, HTMLResponse
 from typing import List
 from datetime import datetime
+from fetch import fetch_with_retry
 
 
 class Player:
-    def __init__(self, pdga_num):
+    def __init__(self, pdga_num, counter=None):
         # rating, career_events, career_wins, upcoming_events
         self.pdga_num = pdga_num
         self.pdga_page = f"https://www.pdga.com/player/{pdga_num}"
-        self.get_pages()
+        self.get_pages(counter)
         self.get_rating()
         self.get_career_events()
         self.get_career_wins()
         self.get_upcoming_events()
         self.get_tournaments_played()
 
-    def get_pages(self):
-        with HTMLSession() as session:
-            self.r_stats = session.get(self.pdga_page)
-            self.r_detail = session.get(self.pdga_page + "/details")
-            self.r_history = session.get(self.pdga_page + "/history")
-            self.r_wins = session.get(self.pdga_page + "/wins")
+    def get_pages(self, counter=None):
+        with HTMLSession() as s:
+            self.r_stats = fetch_with_retry(self.pdga_page, s, counter=counter)
+            self.r_detail = fetch_with_retry(
+                self.pdga_page + "/details", s, counter=counter
+            )
+            self.r_history = fetch_with_retry(
+                self.pdga_page + "/history", s, counter=counter
+            )
+            self.r_wins = fetch_with_retry(self.pdga_page + "/wins", s, counter=counter)
 
     def convert_dates(self, dates):
         if "to" in dates:
@@ -3,11 +3,19 @@ from requests_html import HTMLSession
 from pandas import DataFrame
 import pandas as pd
 import numpy as np
-from typing import List
+from typing import Dict, List, Optional
 from datetime import date, timedelta
 from dateutil.relativedelta import relativedelta
 from player import Player
 from models import PlayerBase
+from fetch import (
+    Checkpoint,
+    CircuitOpenError,
+    RequestCounter,
+    fetch_with_retry,
+    is_transient,
+)
+from ratings_calendar import RATINGS_CALENDAR
 from rich import print
 
 
@@ -21,8 +29,7 @@ def get_ratings_detail(pdga_num: int):
         response: HTML page python requests response
     """
     details_url = f"https://www.pdga.com/player/{pdga_num}/details"
-    session = HTMLSession()
-    response = session.get(details_url)
+    response = fetch_with_retry(details_url)
     return response
 
 
@@ -36,15 +43,26 @@ def get_player_stats(pdga_num: int):
         response: requests response
     """
     details_url = f"https://www.pdga.com/player/{pdga_num}"
-    s = HTMLSession()
-    r = s.get(details_url)
+    r = fetch_with_retry(details_url)
     return r
 
 
-def get_single_tournament(t_url: str):
-    s = HTMLSession()
-    r = s.get(t_url)
-    return r
+def get_single_tournament(
+    t_url: str,
+    session: Optional[HTMLSession] = None,
+    counter: Optional[RequestCounter] = None,
+):
+    """Get tournament results page, retrying on timeouts and 5xx errors
+
+    Args:
+        t_url (str): Tournament url
+        session (HTMLSession, optional): Session to reuse. Defaults to a new session.
+        counter (RequestCounter, optional): Counts every request sent.
+
+    Returns:
+        response: requests response
+    """
+    return fetch_with_retry(t_url, session=session, counter=counter)
 
 
 def get_current_rating(results) -> int:
@@ -220,14 +238,22 @@ def get_single_tour_ratings(response, pdga_num: int) -> List:
         response (Requests Response): scraped page data
         pdga_num (int): Player PDGA number
 
+    Raises:
+        ValueError: Player not found on tournament page
+
     Returns:
         List: Tournament round ratings
     """
     tables = response.html.find(".table-container")
-    table = [t for t in tables if str(pdga_num) in t.text][0]
-    df = pd.read_html(table.html)[0]
+    player_tables = [t for t in tables if str(pdga_num) in t.text]
+    if not player_tables:
+        raise ValueError(f"PDGA# {pdga_num} not found on {response.url}")
+    df = pd.read_html(player_tables[0].html)[0]
     filter_col = [col for col in df if col.startswith("Unnamed")]
-    round_ratings = list(df[df["PDGA#"] == pdga_num][filter_col].values[0])
+    player_rows = df[df["PDGA#"] == pdga_num][filter_col].values
+    if len(player_rows) == 0:
+        raise ValueError(f"PDGA# {pdga_num} not found on {response.url}")
+    round_ratings = list(player_rows[0])
     round_ratings = [int(r) for r in round_ratings if not np.isnan(r)]
     return round_ratings
 
@@ -270,7 +296,9 @@ def manual_ratings() -> List:
     return new_ratings
 
 
-def combine_ratings(existing_results: List, new_ratings: List, current_rating: int):
+def combine_ratings(
+    existing_results: List, new_ratings: List, current_rating: int, verbose=True
+):
     combined_ratings = new_ratings + existing_results
     std_deviation = std_calc(combined_ratings)
     exclude_value = current_rating - std_deviation
@@ -279,50 +307,47 @@ def combine_ratings(existing_results: List, new_ratings: List, current_rating: i
     final_ratings = []
     for rating in combined_ratings:
         if rating <= exclude_value or (current_rating - rating) >= 100:
-            print(f"Rating removed {rating}")
-            pass
+            if verbose:
+                print(f"Rating removed {rating}")
         else:
             final_ratings.append(rating)
     return total_score(final_ratings)
 
 
-def get_second_tues(current_month=date(date.today().year, date.today().month, 1)):
+def get_second_tues(current_month=None):
     """PDGA Ratings Publication Date - https://www.pdga.com/faq/ratings/when-updated
 
-    Get second tuesday of month, defaults to current month
+    Get second tuesday of month, defaults to current month. Uses
+    RATINGS_CALENDAR so overridden months are respected.
 
     Args:
-        current_month (date, optional): date (year, month, day). Defaults to current first day of the month
-        date(date.today().year, date.today().month, 1).
+        current_month (date, optional): date (year, month, day). Defaults to current month.
 
     Returns:
-        date: second Tuesday of given month
+        date: Publication date of given month, None if PDGA skips the month
     """
-    offset = 7 - ((current_month.weekday() - 1) % 7)
-    if offset != 7:
-        offset += 7
-    second_tues = current_month + timedelta(days=offset)
-    return second_tues
+    if current_month is None:
+        current_month = date.today()
+    return RATINGS_CALENDAR.publication_in(current_month.year, current_month.month)
 
 
-def next_ratings_pub():
+def next_ratings_pub(today=None):
     """Get Next PDGA Ratings Date
 
     Checks if ratings have been updated for the current month. If so,
-    gets the next rating date.
+    gets the next rating date. Uses RATINGS_CALENDAR so overridden
+    months are respected.
+
+    Args:
+        today (date, optional): Defaults to today.
 
     Returns:
-        second_tues: Next ratings updates occur on second tues of month
+        date: Next ratings publication date
     """
-    today = date.today()
-    second_tues = get_second_tues(today.replace(day=1))
-    if second_tues > today:
-        return second_tues
-    next_month = today + relativedelta(months=1, day=1)
-    return get_second_tues(next_month)
+    return RATINGS_CALENDAR.next_publication(today)
 
 
-def filter_df(dataframe, date_filter=next_ratings_pub()):
+def filter_df(dataframe, date_filter=None, verbose=True):
     """Filter dataframe to remove ratings that will be dropped on next update
 
     This drops all dates from the last year of the next rating date.
@@ -335,16 +360,24 @@ def filter_df(dataframe, date_filter=next_ratings_pub()):
     Args:
         dataframe (dataframe): PDGA ratings detail
         date_filter (date): default to Date of next ratings update
+        verbose (bool): print the dates filtered on. Defaults to True.
 
     Returns:
         dataframe: Pandas dataframe with dropped ratings
     """
-
-    date_cutoff = date_filter - relativedelta(years=1)
+    if date_filter is None:
+        date_filter = next_ratings_pub()
+    try:
+        # publication dates use the calendar's cutoff bounded window
+        date_cutoff, date_end = RATINGS_CALENDAR.window(date_filter)
+    except ValueError:
+        date_cutoff = date_filter - relativedelta(years=1)
+        date_end = date_filter - timedelta(days=1)
     df = dataframe[
-        (dataframe["Date"] > str(date_cutoff)) & (dataframe["Date"] < str(date_filter))
+        (dataframe["Date"] > str(date_cutoff)) & (dataframe["Date"] <= str(date_end))
     ]
-    print(f"\nFiltering dates between {date_cutoff} - {date_filter}")
+    if verbose:
+        print(f"\nFiltering dates between {date_cutoff} - {date_end}")
     return df
 
 
@@ -361,14 +394,73 @@ def compare_ratings(new_rating, player_rating):
     return rating_diff
 
 
-def auto_import_ratings(player):
-    """Scrape pending tournament ratings"""
+def fetch_pending_ratings(
+    player,
+    checkpoint: Optional[Checkpoint] = None,
+    counter: Optional[RequestCounter] = None,
+) -> Dict:
+    """Scrape pending tournament ratings with a status per event
+
+    A failed event doesn't stop the rest. Completed events, and events
+    that failed for good (player missing from the page, 4xx), are saved to
+    the checkpoint and not fetched again. Timeouts and 429/5xx errors are
+    marked "retry". Once the PDGA circuit breaker opens the remaining
+    events are skipped.
+
+    Args:
+        player (Player): Player with stats and details pages
+        checkpoint (Checkpoint, optional): Completed pages. Defaults to in memory only.
+        counter (RequestCounter, optional): Counts every request sent.
+
+    Returns:
+        Dict: Tournament link to {"status": "ok" | "error" | "retry" | "skipped", "ratings", "error"}
+    """
+    checkpoint = checkpoint or Checkpoint()
+    pdga_num = int(player.pdga_num)
     posted_tour_links = tournament_links(player.r_detail)
     current_year_links = tournament_links(player.r_stats)
     pending_links = compare_tournaments(current_year_links, posted_tour_links)
-    r_tours = [get_single_tournament(link) for link in pending_links]
-    ratings = [get_single_tour_ratings(tour, int(player.pdga_num)) for tour in r_tours]
-    final_ratings = [item for sublist in ratings for item in sublist]
+    events = {}
+    session = HTMLSession()
+    for link in pending_links:
+        ratings = checkpoint.get(pdga_num, link)
+        if ratings is not None:
+            events[link] = {"status": "ok", "ratings": ratings, "error": None}
+            continue
+        error = checkpoint.get_error(pdga_num, link)
+        if error is not None:
+            events[link] = {"status": "error", "ratings": [], "error": error}
+            continue
+        try:
+            r_tour = get_single_tournament(link, session=session, counter=counter)
+            ratings = get_single_tour_ratings(r_tour, pdga_num)
+        except CircuitOpenError as e:
+            events[link] = {"status": "skipped", "ratings": [], "error": str(e)}
+            continue
+        except Exception as e:
+            if is_transient(e):
+                events[link] = {"status": "retry", "ratings": [], "error": str(e)}
+            else:
+                checkpoint.save_error(pdga_num, link, str(e))
+                events[link] = {"status": "error", "ratings": [], "error": str(e)}
+            continue
+        checkpoint.save(pdga_num, link, ratings)
+        events[link] = {"status": "ok", "ratings": ratings, "error": None}
+    checkpoint.flush()
+    return events
+
+
+def auto_import_ratings(player, checkpoint: Optional[Checkpoint] = None):
+    """Scrape pending tournament ratings
+
+    Events that could not be fetched are reported and left out, see
+    fetch_pending_ratings() for per event status.
+    """
+    events = fetch_pending_ratings(player, checkpoint)
+    for link, event in events.items():
+        if event["status"] != "ok":
+            print(f"[red]{event['status'].title()}:[/red] {link} - {event['error']}")
+    final_ratings = [r for event in events.values() for r in event["ratings"]]
     return final_ratings
 
 
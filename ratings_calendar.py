@@ -0,0 +1,214 @@
+# PDGA ratings publication calendar
+from bisect import bisect_left, bisect_right
+from datetime import date, timedelta
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+from dateutil.relativedelta import relativedelta
+
+
+@lru_cache(maxsize=None)
+def second_tuesday(year: int, month: int) -> date:
+    """Second Tuesday of given month
+
+    Args:
+        year (int): Year
+        month (int): Month
+
+    Returns:
+        date: second Tuesday of the month
+    """
+    first = date(year, month, 1)
+    offset = 7 - ((first.weekday() - 1) % 7)
+    if offset != 7:
+        offset += 7
+    return first + timedelta(days=offset)
+
+
+class RatingsCalendar:
+    """Sorted schedule of PDGA ratings publication dates
+
+    Publications default to the second Tuesday of every month,
+    https://www.pdga.com/faq/ratings/when-updated, with a data cutoff
+    cutoff_days before it. Rounds played after the cutoff go into the
+    following publication. PDGA moves or skips some months, use overrides
+    to set those dates (None skips the month) and cutoff_overrides for
+    their cutoffs, both keyed by (year, month).
+
+    The schedule is built once and extended as needed, lookups use a
+    binary search over the sorted dates.
+    """
+
+    def __init__(
+        self,
+        start: Optional[date] = None,
+        end: Optional[date] = None,
+        overrides: Optional[Dict[Tuple[int, int], Optional[date]]] = None,
+        cutoff_days: int = 14,
+        cutoff_overrides: Optional[Dict[Tuple[int, int], date]] = None,
+    ) -> None:
+        today = date.today()
+        self.start = (start or today - relativedelta(years=2)).replace(day=1)
+        self.end = (end or today + relativedelta(years=1)).replace(day=1)
+        self.overrides = dict(overrides or {})
+        self.cutoff_days = cutoff_days
+        self.cutoff_overrides = dict(cutoff_overrides or {})
+        self.build()
+
+    def publication_in(self, year: int, month: int) -> Optional[date]:
+        """Publication date for a month, None if PDGA skips it"""
+        if (year, month) in self.overrides:
+            return self.overrides[(year, month)]
+        return second_tuesday(year, month)
+
+    def cutoff_in(self, year: int, month: int) -> Optional[date]:
+        """Data cutoff for a month's publication, None if PDGA skips it"""
+        pub_date = self.publication_in(year, month)
+        if pub_date is None:
+            return None
+        if (year, month) in self.cutoff_overrides:
+            return self.cutoff_overrides[(year, month)]
+        return pub_date - timedelta(days=self.cutoff_days)
+
+    def build(self):
+        """Build sorted lists of publication and cutoff dates between start and end month
+
+        Raises:
+            ValueError: Cutoffs are out of order with their publications
+        """
+        schedule = []
+        month = self.start
+        while month <= self.end:
+            pub_date = self.publication_in(month.year, month.month)
+            if pub_date is not None:
+                schedule.append((pub_date, self.cutoff_in(month.year, month.month)))
+            month += relativedelta(months=1)
+        schedule.sort()
+        self.pub_dates: List[date] = [pub_date for pub_date, _ in schedule]
+        self.cutoffs: List[date] = [cutoff for _, cutoff in schedule]
+        for prev, cutoff in zip(self.cutoffs, self.cutoffs[1:]):
+            if cutoff < prev:
+                raise ValueError(f"Ratings cutoff {cutoff} is before {prev}")
+        return self.pub_dates
+
+    def override(
+        self,
+        year: int,
+        month: int,
+        pub_date: Optional[date],
+        cutoff: Optional[date] = None,
+    ):
+        """Set publication date for an irregular month
+
+        Args:
+            year (int): Year
+            month (int): Month
+            pub_date (date, optional): Publication date, None if the month is skipped
+            cutoff (date, optional): Data cutoff. Defaults to cutoff_days before pub_date.
+        """
+        self.overrides[(year, month)] = pub_date
+        if cutoff is not None and pub_date is not None:
+            self.cutoff_overrides[(year, month)] = cutoff
+        else:
+            self.cutoff_overrides.pop((year, month), None)
+        self.build()
+
+    def extend(self, day: date):
+        """Grow the schedule so it covers day with a publication and cutoff on either side"""
+        bounds = (self.start, self.end)
+        if day < self.start + relativedelta(months=1):
+            # day can fall before the first month's publication
+            self.start = (day - relativedelta(months=1)).replace(day=1)
+        if day >= self.end:
+            self.end = (day + relativedelta(months=1)).replace(day=1)
+        if (self.start, self.end) != bounds:
+            self.build()
+        while not self.pub_dates or self.pub_dates[-1] <= day or self.cutoffs[-1] < day:
+            self.end += relativedelta(months=1)
+            self.build()
+
+    def next_publication(self, day: Optional[date] = None) -> date:
+        """Next publication after given day
+
+        Args:
+            day (date, optional): Defaults to today.
+
+        Returns:
+            date: First publication date later than day
+        """
+        day = day or date.today()
+        self.extend(day)
+        return self.pub_dates[bisect_right(self.pub_dates, day)]
+
+    def previous_publication(self, day: Optional[date] = None) -> Optional[date]:
+        """Latest publication on or before given day
+
+        Args:
+            day (date, optional): Defaults to today.
+
+        Returns:
+            date: Publication date, None if day is before the schedule
+        """
+        day = day or date.today()
+        self.extend(day)
+        i = bisect_right(self.pub_dates, day)
+        return self.pub_dates[i - 1] if i else None
+
+    def publication_for(self, round_date: date) -> date:
+        """Publication a round played on round_date will first show up in
+
+        First publication whose data cutoff is on or after round_date.
+
+        Args:
+            round_date (date): Date round was played
+
+        Returns:
+            date: Publication date
+        """
+        self.extend(round_date)
+        return self.pub_dates[bisect_left(self.cutoffs, round_date)]
+
+    def index(self, pub_date: date) -> int:
+        """Position of pub_date in the schedule
+
+        Raises:
+            ValueError: pub_date is not a publication date
+        """
+        self.extend(pub_date)
+        i = bisect_left(self.pub_dates, pub_date)
+        if i == len(self.pub_dates) or self.pub_dates[i] != pub_date:
+            raise ValueError(f"{pub_date} is not a ratings publication date")
+        return i
+
+    def cutoff_for(self, pub_date: date) -> date:
+        """Last day rounds count towards the publication on pub_date
+
+        Raises:
+            ValueError: pub_date is not a publication date
+        """
+        i = self.index(pub_date)
+        return self.cutoffs[i]
+
+    def window(self, pub_date: date) -> Tuple[date, date]:
+        """12 month ratings window for a publication
+
+        Bounded by the cutoff of the publication 12 months earlier and the
+        cutoff of pub_date, so it agrees with publication_for().
+
+        Args:
+            pub_date (date): Publication date in the schedule
+
+        Raises:
+            ValueError: pub_date is not a publication date
+
+        Returns:
+            Tuple[date, date]: (start, end) rounds after start up to end count
+        """
+        end = self.cutoff_for(pub_date)
+        start = self.cutoff_in(pub_date.year - 1, pub_date.month)
+        if start is None:
+            start = end - relativedelta(years=1)
+        return start, end
+
+
+RATINGS_CALENDAR = RatingsCalendar()
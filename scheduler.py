@@ -0,0 +1,284 @@
+# Background refresher that pre-computes rating estimates before each publication
+import threading
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional, Set, Tuple
+
+from rich import print
+
+from fetch import Checkpoint, RequestCounter
+from player import Player
+from ratings import (
+    combine_ratings,
+    compare_tournaments,
+    fetch_pending_ratings,
+    filter_df,
+    tournament_links,
+    trans_data,
+)
+from ratings_calendar import RATINGS_CALENDAR, RatingsCalendar
+
+# Player() fetches stats, details, history and wins pages, retries not included
+PLAYER_PAGE_REQUESTS = 4
+
+
+class RatingsRefresher:
+    """Refresh roster rating estimates in the days before a ratings publication
+
+    Each roster player is assigned a day in the lead_days before the next
+    publication. Players are refreshed on or after their day, and the
+    request_budget for the publication is spread evenly over the days left
+    so scrapes don't all land on the second Tuesday. Each day's share is
+    fixed at the start of the day, however often run_once() is called.
+
+    Player pages are fetched once per publication. A player whose pending
+    tournaments don't fit today's share waits for a later day, one that
+    can't fit the rest of the publication budget is deferred.
+
+    Estimates are stored by PDGA number and served from lookup(). Completed
+    tournament pages are kept in the checkpoint for the current publication,
+    so a player waiting for a later day, or one with failed events, only
+    fetches what is missing. Requests are charged as sent, retries included.
+    Spending is kept in the checkpoint state, so with a file backed
+    checkpoint the budget holds across restarts, otherwise it is per process.
+
+    Runs are quiet unless verbose is set.
+    """
+
+    def __init__(
+        self,
+        roster: List[int],
+        lead_days: int = 5,
+        request_budget: int = 500,
+        calendar: RatingsCalendar = RATINGS_CALENDAR,
+        checkpoint: Optional[Checkpoint] = None,
+        verbose: bool = False,
+    ) -> None:
+        self.roster = list(roster)
+        self.lead_days = lead_days
+        self.request_budget = request_budget
+        self.calendar = calendar
+        self.checkpoint = checkpoint or Checkpoint()
+        self.verbose = verbose
+        self.results: Dict[int, Dict] = {}
+        self.spent: Dict[Tuple[date, date], int] = {
+            (date.fromisoformat(pub), date.fromisoformat(day)): n
+            for pub, days in self.checkpoint.state.get("spent", {}).items()
+            for day, n in days.items()
+        }
+        cycle = self.checkpoint.state.get("cycle")
+        self.cycle: Optional[date] = date.fromisoformat(cycle) if cycle else None
+        self.players: Dict[int, Player] = {}
+        self.deferred: Set[int] = set()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def log(self, message: str):
+        if self.verbose:
+            print(message)
+
+    def slot(self, pdga_num: int) -> int:
+        """Day index in the lead window assigned to a player"""
+        return self.roster.index(pdga_num) % self.lead_days
+
+    def window_day(self, today: date, pub_date: date) -> Optional[int]:
+        """Day index of today in the lead window, None if outside the window"""
+        days_left = (pub_date - today).days
+        if days_left <= 0 or days_left > self.lead_days:
+            return None
+        return self.lead_days - days_left
+
+    def is_fresh(self, pdga_num: int, pub_date: date) -> bool:
+        """Estimate is for pub_date and no event is waiting on a transient failure"""
+        result = self.results.get(pdga_num)
+        if result is None or result["pub_date"] != pub_date:
+            return False
+        return all(e["status"] in ("ok", "error") for e in result["events"].values())
+
+    def due_players(self, today: Optional[date] = None) -> List[int]:
+        """Roster players whose slot has come up and have no estimate for the next publication
+
+        Args:
+            today (date, optional): Defaults to today.
+
+        Returns:
+            List[int]: PDGA numbers to refresh
+        """
+        today = today or date.today()
+        pub_date = self.calendar.next_publication(today)
+        day = self.window_day(today, pub_date)
+        if day is None:
+            return []
+        return [
+            p
+            for p in self.roster
+            if self.slot(p) <= day
+            and p not in self.deferred
+            and not self.is_fresh(p, pub_date)
+        ]
+
+    def start_cycle(self, pub_date: date):
+        """Drop cached pages, checkpoint and deferrals when a new publication comes up
+
+        The cycle is saved in the checkpoint state, so a restart during the
+        same cycle keeps the checkpoint.
+        """
+        if self.cycle == pub_date:
+            return
+        self.cycle = pub_date
+        self.players = {}
+        self.deferred = set()
+        self.checkpoint.clear()
+        self.checkpoint.update_state(cycle=pub_date.isoformat())
+
+    def charge(self, pub_date: date, today: date, requests: int):
+        key = (pub_date, today)
+        self.spent[key] = self.spent.get(key, 0) + requests
+        spent_state: Dict[str, Dict[str, int]] = {}
+        for (pub, day), n in self.spent.items():
+            spent_state.setdefault(pub.isoformat(), {})[day.isoformat()] = n
+        self.checkpoint.update_state(spent=spent_state)
+
+    def spent_total(self, pub_date: date, before: Optional[date] = None) -> int:
+        """Requests spent for a publication, optionally only on days before a date"""
+        return sum(
+            n
+            for (pub, day), n in self.spent.items()
+            if pub == pub_date and (before is None or day < before)
+        )
+
+    def daily_budget(self, today: date, pub_date: date) -> int:
+        """Requests left today
+
+        Today's share is the budget left at the start of the day split over
+        the days left before the publication.
+        """
+        days_left = max((pub_date - today).days, 1)
+        remaining = self.request_budget - self.spent_total(pub_date, before=today)
+        share = max(remaining // days_left, 0)
+        return max(share - self.spent.get((pub_date, today), 0), 0)
+
+    def estimate(self, pdga_num: int, pub_date: date, today: date) -> Optional[Dict]:
+        """Scrape player and pending tournaments, then calculate estimated rating
+
+        Args:
+            pdga_num (int): Player PDGA number
+            pub_date (date): Publication the estimate is for
+            today (date): Day requests are charged to
+
+        Returns:
+            Dict: Estimate, None if pending tournaments don't fit in budget
+        """
+        player = self.players.get(pdga_num)
+        if player is None:
+            if self.daily_budget(today, pub_date) < PLAYER_PAGE_REQUESTS:
+                return None
+            counter = RequestCounter()
+            try:
+                player = Player(pdga_num, counter=counter)
+            finally:
+                self.charge(pub_date, today, counter.sent)
+            self.players[pdga_num] = player
+        pending_links = compare_tournaments(
+            tournament_links(player.r_stats), tournament_links(player.r_detail)
+        )
+        uncached = [
+            link for link in pending_links if not self.checkpoint.done(pdga_num, link)
+        ]
+        if len(uncached) > self.request_budget - self.spent_total(pub_date):
+            self.log(f"Deferred {pdga_num}: {len(uncached)} pending events over budget")
+            self.deferred.add(pdga_num)
+            return None
+        if len(uncached) > self.daily_budget(today, pub_date):
+            return None
+        counter = RequestCounter()
+        try:
+            events = fetch_pending_ratings(player, self.checkpoint, counter=counter)
+        finally:
+            self.charge(pub_date, today, counter.sent)
+        new_ratings = [r for event in events.values() for r in event["ratings"]]
+        df = filter_df(trans_data(player.r_detail), pub_date, verbose=self.verbose)
+        return {
+            "pdga_num": pdga_num,
+            "pub_date": pub_date,
+            "rating": player.rating,
+            "new_ratings": new_ratings,
+            "events": events,
+            "estimate": combine_ratings(
+                list(df["Rating"]), new_ratings, player.rating, verbose=self.verbose
+            ),
+            "refreshed": datetime.now(),
+        }
+
+    def run_once(self, today: Optional[date] = None) -> List[int]:
+        """Refresh due players within today's request budget
+
+        Args:
+            today (date, optional): Defaults to today.
+
+        Returns:
+            List[int]: PDGA numbers refreshed
+        """
+        today = today or date.today()
+        pub_date = self.calendar.next_publication(today)
+        self.start_cycle(pub_date)
+        refreshed = []
+        try:
+            for pdga_num in self.due_players(today):
+                if self.daily_budget(today, pub_date) == 0:
+                    break
+                try:
+                    result = self.estimate(pdga_num, pub_date, today)
+                except Exception as e:
+                    self.log(f"Error refreshing {pdga_num}: {e}")
+                    result = None
+                if result is None:
+                    continue
+                with self._lock:
+                    self.results[pdga_num] = result
+                refreshed.append(pdga_num)
+        finally:
+            self.checkpoint.flush()
+        return refreshed
+
+    def lookup(self, pdga_num: int, today: Optional[date] = None) -> Optional[Dict]:
+        """Stored estimate for the next publication
+
+        On publication day the estimate refreshed for that publication is returned.
+
+        Args:
+            pdga_num (int): Player PDGA number
+            today (date, optional): Defaults to today.
+
+        Returns:
+            Dict: Estimate, None if not refreshed yet
+        """
+        today = today or date.today()
+        pub_date = self.calendar.next_publication(today - timedelta(days=1))
+        with self._lock:
+            result = self.results.get(pdga_num)
+        if result is None or result["pub_date"] != pub_date:
+            return None
+        return result
+
+    def _run(self, interval: float):
+        while not self._stop.is_set():
+            self.run_once()
+            self._stop.wait(interval)
+
+    def start(self, interval: float = 3600):
+        """Run the refresher in a background thread
+
+        Args:
+            interval (float, optional): Seconds between runs. Defaults to 3600.
+        """
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, args=(interval,), daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
@@ -9,6 +9,9 @@
 #     - API tournament endpoint: https://www.pdga.com/apps/tournament/live-api/live_results_fetch_event.php?TournID=69137
 
 import csv
+import hashlib
+import json
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
 from typing import List, Dict, Optional, Tuple
 from collections import Counter
@@ -50,6 +53,97 @@ def csv_data(filename):
     return scorecards
 
 
+def round_key(scorecard: Dict) -> str:
+    """Stable hash of a single UDisc round
+
+    Built from player, course, layout, date and hole scores so the same
+    round exported by different club members hashes to the same key.
+
+    Args:
+        scorecard (Dict): UDisc scorecard from csv_data()
+
+    Returns:
+        str: Hex digest identifying the round
+    """
+    data = {
+        "player": scorecard["player"].strip(),
+        "course": scorecard["course"].strip(),
+        "layout": scorecard["layout"].strip(),
+        "date": scorecard["date"].strip(),
+        "hole_scores": scorecard["hole_scores"],
+    }
+    raw = json.dumps(data, sort_keys=True)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+def keyed_csv_data(filename) -> List[Tuple[str, Dict]]:
+    """Open CSV file and pair each scorecard with its round_key()
+
+    Args:
+        filename (Path): UDisc CSV file
+
+    Returns:
+        list[tuple]: (round key, UDisc score)
+    """
+    return [(round_key(card), card) for card in csv_data(filename)]
+
+
+def dedup_rounds(
+    keyed_scorecards: List[Tuple[str, Dict]], store: Optional[Dict] = None
+) -> Dict[str, Dict]:
+    """Merge scorecards into a store keyed by round_key()
+
+    First copy of a round wins, later duplicates are ignored.
+
+    Args:
+        keyed_scorecards (List[Tuple[str, Dict]]): Output of keyed_csv_data()
+        store (Dict, optional): Existing store to merge into. Defaults to a new dict.
+
+    Returns:
+        Dict[str, Dict]: Unique scorecards by round key
+    """
+    if store is None:
+        store = {}
+    for key, card in keyed_scorecards:
+        store.setdefault(key, card)
+    return store
+
+
+def import_csv_dir(directory, pattern="*.csv", max_workers=None) -> List[Dict]:
+    """Import every UDisc CSV in a directory
+
+    Files are parsed in parallel worker processes, then merged and
+    de-duplicated so a round exported by several members counts once.
+    Files that can't be parsed are reported and skipped.
+
+    Args:
+        directory (Path): Folder of UDisc CSV exports
+        pattern (str, optional): Glob for CSV files. Defaults to '*.csv'.
+        max_workers (int, optional): Worker processes. Defaults to CPU count.
+
+    Returns:
+        list[dict]: Unique UDisc scores
+    """
+    files = sorted(Path(directory).glob(pattern))
+    if not files:
+        return []
+    parsed = {}
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = {executor.submit(keyed_csv_data, f): f for f in files}
+        for future in as_completed(futures):
+            filename = futures[future]
+            try:
+                parsed[filename] = future.result()
+            except Exception as e:
+                print(f"[red]Skipped {filename}:[/red] {type(e).__name__} {e}")
+    # merge in file order so the same copy of a round always wins
+    store = {}
+    for filename in files:
+        if filename in parsed:
+            dedup_rounds(parsed[filename], store)
+    return list(store.values())
+
+
 def udisc_rounds(scorecards: List[Dict]) -> List:
     return [UDiscRounds(**card) for card in scorecards]
 
@@ -154,10 +248,13 @@ def num_wins(scores):
 
 
 def main():
-    filename = input("file name (default: scorecards.csv): ")
+    filename = input("file name or folder (default: scorecards.csv): ")
     if not filename:
         filename = "scorecards.csv"
-    udisc_scores = csv_data(filename)
+    if Path(filename).is_dir():
+        udisc_scores = import_csv_dir(filename)
+    else:
+        udisc_scores = csv_data(filename)
     unique_players = player_list(udisc_scores)
     player1, player2 = select_players(unique_players)
     player1_rounds = player_rounds(udisc_scores, player1)
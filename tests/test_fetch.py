@@ -0,0 +1,115 @@
+import json
+
+import pytest
+from requests.exceptions import ConnectionError, HTTPError
+
+import fetch
+from fetch import (
+    Checkpoint,
+    CircuitBreaker,
+    CircuitOpenError,
+    RequestCounter,
+    fetch_with_retry,
+    is_transient,
+)
+
+
+class FakeResponse:
+    def __init__(self, status_code, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise HTTPError(f"{self.status_code} error", response=self)
+
+
+class FakeSession:
+    def __init__(self, *responses):
+        self.responses = list(responses)
+
+    def get(self, url, timeout):
+        response = self.responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    slept = []
+    monkeypatch.setattr(fetch.time, "sleep", slept.append)
+    return slept
+
+
+def test_retries_until_success(sleeps):
+    counter = RequestCounter()
+    session = FakeSession(FakeResponse(503), ConnectionError(), FakeResponse(200))
+    r = fetch_with_retry("u", session, breaker=CircuitBreaker(), counter=counter)
+    assert r.status_code == 200
+    assert counter.sent == 3
+    assert len(sleeps) == 2
+
+
+def test_gives_up_after_retries(sleeps):
+    counter = RequestCounter()
+    session = FakeSession(*[FakeResponse(500)] * 4)
+    with pytest.raises(HTTPError):
+        fetch_with_retry("u", session, breaker=CircuitBreaker(10), counter=counter)
+    assert counter.sent == 4
+
+
+def test_client_error_not_retried(sleeps):
+    counter = RequestCounter()
+    session = FakeSession(FakeResponse(404))
+    with pytest.raises(HTTPError):
+        fetch_with_retry("u", session, breaker=CircuitBreaker(), counter=counter)
+    assert counter.sent == 1
+    assert sleeps == []
+
+
+def test_honours_retry_after(sleeps):
+    session = FakeSession(FakeResponse(429, {"Retry-After": "7"}), FakeResponse(200))
+    fetch_with_retry("u", session, breaker=CircuitBreaker())
+    assert sleeps == [7.0]
+
+
+def test_long_retry_after_raises_instead_of_sleeping(sleeps):
+    breaker = CircuitBreaker()
+    session = FakeSession(FakeResponse(429, {"Retry-After": "86400"}))
+    with pytest.raises(HTTPError):
+        fetch_with_retry("u", session, breaker=breaker)
+    assert sleeps == []
+    assert breaker.failures == 1
+
+
+def test_circuit_opens_after_failures(sleeps):
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60)
+    session = FakeSession(FakeResponse(503), FakeResponse(503))
+    with pytest.raises(CircuitOpenError):
+        fetch_with_retry("u", session, breaker=breaker)
+    assert breaker.is_open
+
+
+def test_is_transient():
+    assert is_transient(CircuitOpenError())
+    assert is_transient(ConnectionError())
+    assert is_transient(HTTPError(response=FakeResponse(503)))
+    assert not is_transient(HTTPError(response=FakeResponse(404)))
+    assert not is_transient(ValueError("PDGA# 1 not found"))
+
+
+def test_checkpoint_flushes_in_batches(tmp_path):
+    path = tmp_path / "checkpoint.json"
+    checkpoint = Checkpoint(path, flush_every=3)
+    checkpoint.save(1, "a", [900])
+    checkpoint.save(1, "b", [910])
+    assert not path.exists()
+    checkpoint.save(1, "c", [920])
+    assert len(json.loads(path.read_text())["pages"]) == 3
+    checkpoint.save_error(1, "d", "PDGA# 1 not found")
+    checkpoint.flush()
+    restored = Checkpoint(path)
+    assert restored.get(1, "a") == [900]
+    assert restored.done(1, "d")
+    assert restored.get_error(1, "d") == "PDGA# 1 not found"
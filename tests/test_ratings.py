@@ -0,0 +1,20 @@
+from datetime import date
+
+import pandas as pd
+
+from ratings import filter_df
+
+
+def ratings_df():
+    dates = ["2023-03-20", "2023-04-01", "2024-03-20", "2024-04-01"]
+    return pd.DataFrame({"Date": pd.to_datetime(dates), "Rating": [900, 910, 920, 930]})
+
+
+def test_filter_df_publication_uses_calendar_window():
+    df = filter_df(ratings_df(), date(2024, 4, 9))
+    assert list(df["Rating"]) == [910, 920]
+
+
+def test_filter_df_accepts_any_date():
+    df = filter_df(ratings_df(), date(2024, 4, 10))
+    assert list(df["Rating"]) == [920, 930]
@@ -0,0 +1,70 @@
+from datetime import date
+
+import pytest
+
+from ratings_calendar import RatingsCalendar, second_tuesday
+
+
+def calendar():
+    return RatingsCalendar(date(2024, 1, 1), date(2024, 12, 1))
+
+
+def test_second_tuesday():
+    assert second_tuesday(2024, 1) == date(2024, 1, 9)
+    assert second_tuesday(2024, 10) == date(2024, 10, 8)
+
+
+def test_next_and_previous_publication():
+    cal = calendar()
+    assert cal.next_publication(date(2024, 4, 9)) == date(2024, 5, 14)
+    assert cal.previous_publication(date(2024, 4, 9)) == date(2024, 4, 9)
+    assert cal.previous_publication(date(2020, 1, 1)) == date(2019, 12, 10)
+    assert cal.next_publication(date(2026, 1, 1)) == date(2026, 1, 13)
+
+
+def test_publication_for_uses_cutoff():
+    cal = calendar()
+    assert cal.publication_for(date(2024, 3, 26)) == date(2024, 4, 9)
+    assert cal.publication_for(date(2024, 3, 27)) == date(2024, 5, 14)
+
+
+def test_moved_publication_keeps_cutoff_on_its_month():
+    cal = calendar()
+    cal.override(2024, 3, date(2024, 4, 2), cutoff=date(2024, 3, 19))
+    assert cal.cutoff_for(date(2024, 4, 2)) == date(2024, 3, 19)
+    assert cal.cutoff_for(date(2024, 4, 9)) == date(2024, 3, 26)
+    assert cal.publication_for(date(2024, 3, 19)) == date(2024, 4, 2)
+    assert cal.publication_for(date(2024, 3, 25)) == date(2024, 4, 9)
+
+
+def test_skipped_month_drops_cutoff_override():
+    cal = calendar()
+    cal.override(2024, 6, date(2024, 6, 11), cutoff=date(2024, 5, 20))
+    cal.override(2024, 6, None)
+    assert (2024, 6) not in cal.cutoff_overrides
+    assert date(2024, 6, 11) not in cal.pub_dates
+    assert cal.publication_for(date(2024, 5, 1)) == date(2024, 7, 9)
+
+
+def test_out_of_order_cutoff_raises():
+    cal = calendar()
+    with pytest.raises(ValueError):
+        cal.override(2024, 5, date(2024, 5, 14), cutoff=date(2024, 3, 1))
+
+
+def test_window_agrees_with_publication_for():
+    cal = calendar()
+    start, end = cal.window(date(2024, 4, 9))
+    assert (start, end) == (date(2023, 3, 28), date(2024, 3, 26))
+    assert cal.publication_for(end) == date(2024, 4, 9)
+    assert cal.publication_for(start) == date(2023, 4, 11)
+
+
+def test_window_rejects_non_publication():
+    with pytest.raises(ValueError):
+        calendar().window(date(2024, 4, 10))
+
+
+def test_cutoff_for_extends_schedule():
+    cal = RatingsCalendar(date(2024, 10, 1), date(2024, 12, 1))
+    assert cal.cutoff_for(date(2024, 4, 9)) == date(2024, 3, 26)
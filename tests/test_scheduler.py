@@ -0,0 +1,157 @@
+from datetime import date
+
+import pandas as pd
+import pytest
+
+import scheduler
+from fetch import Checkpoint
+from ratings_calendar import RatingsCalendar
+from scheduler import PLAYER_PAGE_REQUESTS, RatingsRefresher
+
+PUB = date(2023, 11, 14)
+LEAD_DAYS = [date(2023, 11, d) for d in range(9, 14)]
+
+
+class FakePlayer:
+    pending = {}
+
+    def __init__(self, pdga_num, counter=None):
+        counter.sent += PLAYER_PAGE_REQUESTS
+        self.pdga_num = pdga_num
+        self.rating = 900
+        self.r_detail = ["posted"]
+        self.r_stats = ["posted"] + self.pending.get(pdga_num, ["t1", "t2"])
+
+
+def fake_fetch_pending_ratings(player, checkpoint, counter=None):
+    events = {}
+    for link in player.r_stats[1:]:
+        if checkpoint.get(player.pdga_num, link) is None:
+            counter.sent += 1
+            checkpoint.save(player.pdga_num, link, [950])
+        events[link] = {"status": "ok", "ratings": [950], "error": None}
+    return events
+
+
+@pytest.fixture(autouse=True)
+def fake_pdga(monkeypatch):
+    monkeypatch.setattr(scheduler, "Player", FakePlayer)
+    monkeypatch.setattr(scheduler, "tournament_links", lambda page: page)
+    monkeypatch.setattr(scheduler, "fetch_pending_ratings", fake_fetch_pending_ratings)
+    monkeypatch.setattr(
+        scheduler,
+        "trans_data",
+        lambda page: pd.DataFrame(
+            {"Date": pd.to_datetime(["2023-06-01"]), "Rating": [900]}
+        ),
+    )
+    FakePlayer.pending = {}
+
+
+def refresher(roster, budget, checkpoint=None):
+    calendar = RatingsCalendar(date(2023, 1, 1), date(2024, 12, 1))
+    return RatingsRefresher(
+        roster,
+        lead_days=5,
+        request_budget=budget,
+        calendar=calendar,
+        checkpoint=checkpoint,
+    )
+
+
+def test_due_players_by_slot():
+    r = refresher(range(10), 500)
+    assert r.due_players(date(2023, 11, 8)) == []
+    assert r.due_players(LEAD_DAYS[0]) == [0, 5]
+    assert r.due_players(LEAD_DAYS[1]) == [0, 1, 5, 6]
+    assert r.due_players(PUB) == []
+
+
+def test_hourly_runs_spread_budget_over_window():
+    r = refresher(range(1000), 500)
+    for i, day in enumerate(LEAD_DAYS):
+        share = (500 - r.spent_total(PUB)) // (len(LEAD_DAYS) - i)
+        for _ in range(24):
+            r.run_once(day)
+        assert r.spent[(PUB, day)] <= share
+    assert r.spent[(PUB, LEAD_DAYS[0])] == 100
+    assert r.spent_total(PUB) <= 500
+    assert r.daily_budget(LEAD_DAYS[-1], PUB) < PLAYER_PAGE_REQUESTS
+
+
+def test_player_over_budget_is_deferred_once():
+    FakePlayer.pending = {1: [f"t{i}" for i in range(600)]}
+    r = refresher([1], 500)
+    for day in LEAD_DAYS:
+        for _ in range(24):
+            r.run_once(day)
+    assert r.deferred == {1}
+    assert r.spent_total(PUB) == PLAYER_PAGE_REQUESTS
+    assert r.lookup(1, PUB) is None
+
+
+def test_large_player_waits_for_a_later_day():
+    FakePlayer.pending = {1: [f"t{i}" for i in range(200)]}
+    r = refresher([1], 500)
+    for day in LEAD_DAYS:
+        r.run_once(day)
+    assert r.spent_total(PUB) == PLAYER_PAGE_REQUESTS + 200
+    assert r.lookup(1, PUB)["new_ratings"] == [950] * 200
+
+
+def test_spending_survives_restart(tmp_path):
+    path = tmp_path / "checkpoint.json"
+    r = refresher(range(1000), 500, Checkpoint(path))
+    r.run_once(LEAD_DAYS[0])
+    spent = r.spent_total(PUB)
+    restarted = refresher(range(1000), 500, Checkpoint(path))
+    assert restarted.spent_total(PUB) == spent
+    assert restarted.daily_budget(LEAD_DAYS[0], PUB) == 0
+
+
+def test_checkpoint_kept_across_restart_in_same_cycle(tmp_path):
+    path = tmp_path / "checkpoint.json"
+    r = refresher([1], 500, Checkpoint(path))
+    r.run_once(LEAD_DAYS[0])
+    restarted = refresher([1], 500, Checkpoint(path))
+    restarted.run_once(LEAD_DAYS[1])
+    assert restarted.checkpoint.get(1, "t1") == [950]
+    assert restarted.spent.get((PUB, LEAD_DAYS[1]), 0) == PLAYER_PAGE_REQUESTS
+
+
+def test_checkpoint_cleared_for_next_cycle(tmp_path):
+    path = tmp_path / "checkpoint.json"
+    r = refresher([1], 500, Checkpoint(path))
+    r.run_once(LEAD_DAYS[0])
+    r.run_once(date(2023, 11, 20))
+    assert r.checkpoint.pages == {}
+    assert Checkpoint(path).state["cycle"] == "2023-12-12"
+
+
+def test_permanent_event_error_does_not_starve_roster(monkeypatch):
+    import ratings
+
+    def get_single_tournament(link, session=None, counter=None):
+        counter.sent += 1
+        return link
+
+    def get_single_tour_ratings(link, pdga_num):
+        if link == "missing":
+            raise ValueError(f"PDGA# {pdga_num} not found")
+        return [950]
+
+    monkeypatch.setattr(
+        scheduler, "fetch_pending_ratings", ratings.fetch_pending_ratings
+    )
+    monkeypatch.setattr(ratings, "tournament_links", lambda page: page)
+    monkeypatch.setattr(ratings, "get_single_tournament", get_single_tournament)
+    monkeypatch.setattr(ratings, "get_single_tour_ratings", get_single_tour_ratings)
+    FakePlayer.pending = {p: ["t1", "t2", "t3"] for p in range(10)}
+    FakePlayer.pending[0] = ["t1", "t2", "missing"]
+    r = refresher(range(10), 70)
+    for day in LEAD_DAYS:
+        for _ in range(24):
+            r.run_once(day)
+    assert all(r.lookup(p, PUB) is not None for p in range(10))
+    assert r.lookup(0, PUB)["events"]["missing"]["status"] == "error"
+    assert r.spent_total(PUB) == 70